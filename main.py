@@ -1,13 +1,79 @@
-from fastapi import FastAPI, HTTPException
+from fastapi import Depends, FastAPI, HTTPException, Request
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse
 from fastapi.staticfiles import StaticFiles
-from pydantic import BaseModel
-from writerai import Writer
+from pydantic import BaseModel, Field, field_validator
+from pydantic_core import PydanticCustomError
+from sse_starlette.sse import EventSourceResponse
+from writerai import AsyncWriter, DefaultAsyncHttpxClient, APIError, AuthenticationError, RateLimitError
+from cachetools import TTLCache
+from collections import deque
+from contextlib import asynccontextmanager
+from functools import partial
+import asyncio
+import hashlib
+import json
+import orjson
 import os
+import re
+import sys
+import time
+from types import MappingProxyType
 from typing import Optional
+import httpx
+
+# Helper function to create the pooled HTTP client for Writer API calls, so
+# connections (and TLS sessions) are kept alive across requests
+def make_pooled_client() -> httpx.AsyncClient:
+    return DefaultAsyncHttpxClient(
+        limits=httpx.Limits(max_connections=100, max_keepalive_connections=50),
+        timeout=httpx.Timeout(60.0, connect=5.0),
+        http2=True
+    )
+
+# Create the Writer client when each worker starts and close it on shutdown,
+# rather than at import time
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # You'll need to set your WRITER_API_KEY environment variable
+    app.state.writer = AsyncWriter(
+        api_key=os.getenv("WRITER_API_KEY"),
+        http_client=make_pooled_client()
+    )
+    yield
+    await app.state.writer.close()
 
 # Initialize FastAPI app
-app = FastAPI(title="Text Summarizer API", version="1.0.0")
+app = FastAPI(title="Text Summarizer API", version="1.0.0", lifespan=lifespan)
+
+# Maximum accepted input size, in characters
+MAX_INPUT_CHARS = 100_000
+
+# Maximum accepted request body size, in bytes. Leaves room for a text of
+# MAX_INPUT_CHARS even when every character is sent as a \uXXXX JSON escape.
+MAX_REQUEST_BYTES = 6 * MAX_INPUT_CHARS + 1024
+
+# ASGI middleware that rejects oversized requests from their Content-Length
+# before the body is read into memory. As plain ASGI it doesn't wrap responses,
+# so streamed responses pass straight through.
+class LimitRequestSizeMiddleware:
+    def __init__(self, app, max_bytes: int):
+        self.app = app
+        self.max_bytes = max_bytes
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] == "http":
+            for name, value in scope["headers"]:
+                if name == b"content-length":
+                    if value.isdigit() and int(value) > self.max_bytes:
+                        response = JSONResponse(status_code=413, content={"detail": "Request body too large"})
+                        await response(scope, receive, send)
+                        return
+                    break
+        await self.app(scope, receive, send)
+
+# Add the size limit before CORS so 413 responses still get CORS headers
+app.add_middleware(LimitRequestSizeMiddleware, max_bytes=MAX_REQUEST_BYTES)
 
 # Get CORS origins from environment variable or use defaults
 cors_origins = os.getenv("CORS_ORIGINS", "http://localhost:3000,http://localhost:5173,http://localhost:5174").split(",")
@@ -21,18 +87,73 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-# Initialize Writer client
-# You'll need to set your WRITER_API_KEY environment variable
-writer_client = Writer(
-    api_key=os.getenv("WRITER_API_KEY")
-)
+# Writer model used for summarization
+WRITER_MODEL = "palmyra-x-004"
+
+# Default max_tokens when the request doesn't specify max_length
+DEFAULT_MAX_TOKENS = 500
+
+# Summarization instructions for each style, sent ahead of the text
+CONCISE_PREFIX = "Please provide a concise summary of the following text, capturing the main points in a clear and brief manner."
+DETAILED_PREFIX = "Please provide a detailed summary of the following text, maintaining important details and context."
+BULLET_PREFIX = "Please summarize the following text in bullet points format. Focus on the key points and main ideas."
+
+# How long cached summaries stay valid, in seconds
+SUMMARY_CACHE_TTL = 3600
+
+# In-process cache of recent summaries, keyed by _cache_key()
+_summary_cache = TTLCache(maxsize=1024, ttl=SUMMARY_CACHE_TTL)
+_summary_cache_lock = asyncio.Lock()
+
+# Tasks for summaries currently being generated, keyed by _cache_key(), so
+# identical concurrent requests share one Writer call
+_inflight: dict[str, asyncio.Future] = {}
+
+# Near-duplicate cache for slightly edited copies of recently summarized texts.
+# Texts are compared by fixed-size MinHash signatures of their word 3-grams, so
+# memory per entry and lookup cost don't grow with the text. At the 0.9 threshold
+# a single-word edit reliably matches from about 80 words of text; shorter texts
+# only hit the exact-match cache.
+# Entries are (created_at, style, max_tokens, shingle_count, signature, summary, summary_word_count).
+NEAR_DUPLICATE_THRESHOLD = 0.9
+NEAR_DUPLICATE_SIGNATURE_SIZE = 128
+_EMPTY_BIN = sys.maxsize
+_near_duplicate_cache = deque(maxlen=256)
+
+# Streamed tokens are batched into at most one event every STREAM_FLUSH_INTERVAL
+# seconds, or sooner once more than STREAM_FLUSH_CHARS are buffered
+STREAM_FLUSH_INTERVAL = 0.02
+STREAM_FLUSH_CHARS = 256
+
+# Maximum number of encoded events buffered between the Writer stream and the client
+STREAM_QUEUE_SIZE = 64
+
+# Marks the end of the queued events for a stream
+_STREAM_END = object()
+
+# Line separators that must be split into separate SSE data lines
+_LINE_SEP_RE = re.compile(rb"\r\n|\r|\n")
+
+# Vite build output with a content hash in the file name, e.g. assets/index-CfRWhagn.js
+_HASHED_ASSET_RE = re.compile(r"^assets/.+-[A-Za-z0-9_-]{8}\.(?:js|css|woff2?)$")
 
 # Pydantic models for request/response
 class TextSummarizeRequest(BaseModel):
-    text: str
+    text: str = Field(..., min_length=50, max_length=MAX_INPUT_CHARS)
     max_length: Optional[int] = None
     style: Optional[str] = "concise"  # concise, detailed, bullet_points
 
+    # min_length above counts surrounding whitespace, so check the stripped text too
+    @field_validator("text")
+    @classmethod
+    def _text_long_enough(cls, v: str) -> str:
+        stripped_length = len(v.strip())
+        if not stripped_length:
+            raise PydanticCustomError("text_empty", "Text cannot be empty")
+        if stripped_length < 50:
+            raise PydanticCustomError("text_too_short", "Text must be at least 50 characters long")
+        return v
+
 class TextSummarizeResponse(BaseModel):
     summary: str
     original_word_count: int
@@ -43,9 +164,101 @@ class HealthResponse(BaseModel):
     status: str
     message: str
 
-# Helper function to count words
+# Matches a single whitespace-delimited word
+_WORD_RE = re.compile(r"\S+")
+
+# Helper function to count words (without building a list of them)
 def count_words(text: str) -> int:
-    return len(text.strip().split())
+    return sum(1 for _ in _WORD_RE.finditer(text))
+
+# Helper function to build the Writer chat messages from a prebuilt system message
+def _build_messages(system_message: dict, text: str) -> list:
+    return [system_message, {"role": "user", "content": text}]
+
+# Message builder for each supported style, with the system message built once at import
+_STYLE_TABLE = MappingProxyType({
+    "bullet_points": partial(_build_messages, {"role": "system", "content": BULLET_PREFIX}),
+    "detailed": partial(_build_messages, {"role": "system", "content": DETAILED_PREFIX}),
+    "concise": partial(_build_messages, {"role": "system", "content": CONCISE_PREFIX}),
+})
+
+# Helper function to build the summary cache key for a request
+def _cache_key(request: TextSummarizeRequest, max_tokens: int) -> str:
+    payload = json.dumps(
+        {
+            "model": WRITER_MODEL,
+            "style": request.style,
+            "max_tokens": max_tokens,
+            "text": request.text,
+        },
+        sort_keys=True,
+    )
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+# Helper function to get the number of distinct word 3-grams of a text and their
+# one-permutation MinHash signature (the smallest 3-gram hash in each of
+# NEAR_DUPLICATE_SIGNATURE_SIZE bins)
+def _minhash_signature(text: str) -> tuple:
+    words = text.lower().split()
+    shingles = set(zip(words, words[1:], words[2:])) or {(word,) for word in words}
+    signature = [_EMPTY_BIN] * NEAR_DUPLICATE_SIGNATURE_SIZE
+    for shingle in shingles:
+        h = hash(shingle)
+        i = h % NEAR_DUPLICATE_SIGNATURE_SIZE
+        if h < signature[i]:
+            signature[i] = h
+    return len(shingles), tuple(signature)
+
+# Helper function to estimate the Jaccard similarity of two texts from their
+# signatures, ignoring bins that are empty in both
+def _signature_similarity(a: tuple, b: tuple) -> float:
+    matches = filled = 0
+    for x, y in zip(a, b):
+        if x != y:
+            filled += 1
+        elif x != _EMPTY_BIN:
+            matches += 1
+            filled += 1
+    return matches / filled if filled else 0.0
+
+# Helper function to find a cached summary of a near-identical text
+def _find_near_duplicate(style: Optional[str], max_tokens: int, shingle_count: int, signature: tuple):
+    now = time.monotonic()
+    for created_at, entry_style, entry_max_tokens, entry_shingle_count, entry_signature, summary, summary_word_count in reversed(_near_duplicate_cache):
+        if now - created_at > SUMMARY_CACHE_TTL:
+            continue
+        if entry_style != style or entry_max_tokens != max_tokens:
+            continue
+        # Jaccard similarity can't reach the threshold if the sizes differ too much
+        smaller, larger = sorted((shingle_count, entry_shingle_count))
+        if smaller < NEAR_DUPLICATE_THRESHOLD * larger:
+            continue
+        if _signature_similarity(signature, entry_signature) >= NEAR_DUPLICATE_THRESHOLD:
+            return summary, summary_word_count
+    return None
+
+# Dependency that provides the Writer client created in lifespan()
+def get_writer_client(request: Request) -> AsyncWriter:
+    return request.app.state.writer
+
+# Done callback that drops a finished summary task from _inflight
+def _forget_inflight(cache_key: str, task: asyncio.Future):
+    if _inflight.get(cache_key) is task:
+        del _inflight[cache_key]
+    # Mark any exception as retrieved so it isn't logged when every caller went away
+    if not task.cancelled():
+        task.exception()
+
+# Helper function to encode an SSE event with a text payload straight to bytes,
+# splitting it into one data line per line of text
+def _text_event(event: str, text: str) -> bytes:
+    data = b"".join(b"data: " + line + b"\r\n" for line in _LINE_SEP_RE.split(text.encode()))
+    return b"event: " + event.encode() + b"\r\n" + data + b"\r\n"
+
+# Helper function to encode an SSE event with a JSON payload straight to bytes
+# (orjson output has no raw newlines, so it always fits on one data line)
+def _json_event(event: str, payload: dict) -> bytes:
+    return b"event: " + event.encode() + b"\r\ndata: " + orjson.dumps(payload) + b"\r\n\r\n"
 
 # Health check endpoint
 @app.get("/health", response_model=HealthResponse)
@@ -56,89 +269,210 @@ async def health_check():
         message="Text Summarizer API is running"
     )
 
+# Summarize a request that missed the exact-match cache, calling Writer AI unless
+# a near-identical text was summarized recently
+async def _summarize_with_writer(writer_client: AsyncWriter, request: TextSummarizeRequest, max_tokens: int, cache_key: str) -> TextSummarizeResponse:
+    # Count original words
+    original_word_count = count_words(request.text)
+    
+    # Reuse the summary of a near-identical text, with counts for this text
+    shingle_count, signature = _minhash_signature(request.text)
+    near_duplicate = _find_near_duplicate(request.style, max_tokens, shingle_count, signature)
+    if near_duplicate is not None:
+        summary, summary_word_count = near_duplicate
+        compression_ratio = round((1 - summary_word_count / original_word_count) * 100, 1) if original_word_count > 0 else 0
+        return TextSummarizeResponse(
+            summary=summary,
+            original_word_count=original_word_count,
+            summary_word_count=summary_word_count,
+            compression_ratio=compression_ratio
+        )
+    
+    # Call Writer AI for summarization using the correct method.
+    # The instructions go first as a static system message so the prompt
+    # prefix is identical across calls of the same style.
+    try:
+        response = await writer_client.chat.chat(
+            model=WRITER_MODEL,  # Use Writer's model
+            messages=_STYLE_TABLE.get(request.style, _STYLE_TABLE["concise"])(request.text),
+            max_tokens=max_tokens,
+            temperature=0.3  # Lower temperature for more consistent summaries
+        )
+    except AuthenticationError:
+        raise HTTPException(
+            status_code=401,
+            detail="Writer API key not configured. Please set WRITER_API_KEY environment variable."
+        )
+    except RateLimitError:
+        raise HTTPException(
+            status_code=429,
+            detail="Rate limit exceeded. Please try again later."
+        )
+    except APIError as e:
+        raise HTTPException(
+            status_code=500,
+            detail=f"Error generating summary: {str(e)}"
+        )
+    
+    # Extract the summary from the response
+    summary = response.choices[0].message.content.strip()
+    
+    # Count summary words
+    summary_word_count = count_words(summary)
+    
+    # Calculate compression ratio
+    compression_ratio = round((1 - summary_word_count / original_word_count) * 100, 1) if original_word_count > 0 else 0
+    
+    # Cache the result for identical future requests
+    async with _summary_cache_lock:
+        _summary_cache[cache_key] = (summary, original_word_count, summary_word_count, compression_ratio)
+        _near_duplicate_cache.append(
+            (time.monotonic(), request.style, max_tokens, shingle_count, signature, summary, summary_word_count)
+        )
+    
+    return TextSummarizeResponse(
+        summary=summary,
+        original_word_count=original_word_count,
+        summary_word_count=summary_word_count,
+        compression_ratio=compression_ratio
+    )
+
 # Text summarization endpoint
 @app.post("/api/summarize", response_model=TextSummarizeResponse)
-async def summarize_text(request: TextSummarizeRequest):
+async def summarize_text(request: TextSummarizeRequest, writer_client: AsyncWriter = Depends(get_writer_client)):
     """
     Summarize the provided text using Writer AI
     """
-    try:
-        # Validate input
-        if not request.text.strip():
-            raise HTTPException(status_code=400, detail="Text cannot be empty")
-        
-        if len(request.text.strip()) < 50:
-            raise HTTPException(status_code=400, detail="Text must be at least 50 characters long")
-        
-        # Count original words
-        original_word_count = count_words(request.text)
-        
-        # Create summarization prompt based on style
-        if request.style == "bullet_points":
-            prompt = f"""Please summarize the following text in bullet points format. Focus on the key points and main ideas:
-
-{request.text}
-
-Summary (bullet points):"""
-        elif request.style == "detailed":
-            prompt = f"""Please provide a detailed summary of the following text, maintaining important details and context:
-
-{request.text}
-
-Detailed summary:"""
-        else:  # concise
-            prompt = f"""Please provide a concise summary of the following text, capturing the main points in a clear and brief manner:
-
-{request.text}
-
-Concise summary:"""
-        
-        # Call Writer AI for summarization using the correct method
-        response = writer_client.chat.chat(
-            model="palmyra-x-004",  # Use Writer's model
-            messages=[
-                {
-                    "role": "user",
-                    "content": prompt
-                }
-            ],
-            max_tokens=request.max_length if request.max_length else 500,
-            temperature=0.3  # Lower temperature for more consistent summaries
-        )
-        
-        # Extract the summary from the response
-        summary = response.choices[0].message.content.strip()
-        
-        # Count summary words
-        summary_word_count = count_words(summary)
-        
-        # Calculate compression ratio
-        compression_ratio = round((1 - summary_word_count / original_word_count) * 100, 1) if original_word_count > 0 else 0
-        
+    max_tokens = request.max_length if request.max_length else DEFAULT_MAX_TOKENS
+
+    # Return a cached summary for identical requests
+    cache_key = _cache_key(request, max_tokens)
+    cached = _summary_cache.get(cache_key)
+    if cached is not None:
+        summary, original_word_count, summary_word_count, compression_ratio = cached
         return TextSummarizeResponse(
             summary=summary,
             original_word_count=original_word_count,
             summary_word_count=summary_word_count,
             compression_ratio=compression_ratio
         )
-        
-    except Exception as e:
-        # Handle Writer API errors or other exceptions
-        if "api_key" in str(e).lower():
-            raise HTTPException(
-                status_code=401, 
-                detail="Writer API key not configured. Please set WRITER_API_KEY environment variable."
-            )
-        elif "rate limit" in str(e).lower():
-            raise HTTPException(
-                status_code=429,
-                detail="Rate limit exceeded. Please try again later."
-            )
-        else:
-            raise HTTPException(
-                status_code=500,
-                detail=f"Error generating summary: {str(e)}"
+    
+    # Join an identical request that is already being summarized, or start the
+    # summary in its own task so it outlives whichever client started it
+    task = _inflight.get(cache_key)
+    if task is None:
+        task = asyncio.create_task(_summarize_with_writer(writer_client, request, max_tokens, cache_key))
+        _inflight[cache_key] = task
+        task.add_done_callback(partial(_forget_inflight, cache_key))
+    
+    # Shield the shared task so a disconnecting client doesn't cancel it for the others
+    return await asyncio.shield(task)
+
+# Streaming text summarization endpoint (Server-Sent Events)
+@app.post("/api/summarize/stream")
+async def summarize_text_stream(request: TextSummarizeRequest, writer_client: AsyncWriter = Depends(get_writer_client)):
+    """
+    Summarize the provided text using Writer AI, streaming the summary as it is generated
+    """
+    max_tokens = request.max_length if request.max_length else DEFAULT_MAX_TOKENS
+    
+    # Reads the Writer stream into a bounded queue of encoded SSE events, so the
+    # Writer connection drains at its own pace and slow clients only apply
+    # backpressure once STREAM_QUEUE_SIZE events are waiting
+    async def read_stream(queue: asyncio.Queue):
+        try:
+            # Count original words
+            original_word_count = count_words(request.text)
+            
+            stream = await writer_client.chat.chat(
+                model=WRITER_MODEL,
+                messages=_STYLE_TABLE.get(request.style, _STYLE_TABLE["concise"])(request.text),
+                max_tokens=max_tokens,
+                temperature=0.3,
+                stream=True
             )
+            
+            # Forward tokens as they arrive, coalescing those that arrive
+            # close together into a single event to cut per-event overhead.
+            # The first token is sent at once, and no token waits more than
+            # STREAM_FLUSH_INTERVAL, even if the next one is slow to arrive.
+            summary_parts = []
+            flushed = 0  # number of parts already sent
+            buffered_chars = 0
+            last_flush = float("-inf")
+            chunks = aiter(stream)
+            next_chunk = asyncio.ensure_future(anext(chunks, None))
+            try:
+                while True:
+                    # Wait for the next token, but only until buffered text is due
+                    timeout = None
+                    if flushed < len(summary_parts):
+                        timeout = max(0.0, last_flush + STREAM_FLUSH_INTERVAL - time.monotonic())
+                    done, _ = await asyncio.wait({next_chunk}, timeout=timeout)
+                    if done:
+                        chunk = next_chunk.result()
+                        if chunk is None:
+                            break
+                        next_chunk = asyncio.ensure_future(anext(chunks, None))
+                        content = getattr(chunk.choices[0].delta, "content", None)
+                        if content:
+                            summary_parts.append(content)
+                            buffered_chars += len(content)
+                    
+                    now = time.monotonic()
+                    if flushed < len(summary_parts) and (now - last_flush >= STREAM_FLUSH_INTERVAL or buffered_chars > STREAM_FLUSH_CHARS):
+                        await queue.put(_text_event("chunk", "".join(summary_parts[flushed:])))
+                        flushed = len(summary_parts)
+                        buffered_chars = 0
+                        last_flush = now
+            finally:
+                next_chunk.cancel()
+            
+            # Flush whatever is left before the final event
+            if flushed < len(summary_parts):
+                await queue.put(_text_event("chunk", "".join(summary_parts[flushed:])))
+            
+            # Join once at the end rather than concatenating per token
+            summary = "".join(summary_parts).strip()
+            summary_word_count = count_words(summary)
+            compression_ratio = round((1 - summary_word_count / original_word_count) * 100, 1) if original_word_count > 0 else 0
+            
+            final_data = {
+                "summary": summary,
+                "original_word_count": original_word_count,
+                "summary_word_count": summary_word_count,
+                "compression_ratio": compression_ratio
+            }
+            await queue.put(_json_event("complete", final_data))
+            
+        # Headers are already sent, so report Writer errors as an event
+        except AuthenticationError:
+            await queue.put(_json_event("error", {"detail": "Writer API key not configured. Please set WRITER_API_KEY environment variable."}))
+        except RateLimitError:
+            await queue.put(_json_event("error", {"detail": "Rate limit exceeded. Please try again later."}))
+        except APIError as e:
+            await queue.put(_json_event("error", {"detail": f"Error generating summary: {str(e)}"}))
+        except Exception:
+            # Still end the stream; generate_stream re-raises this when it awaits the reader.
+            # (No end marker on cancellation, since there is no consumer left to read it.)
+            await queue.put(_STREAM_END)
+            raise
+        await queue.put(_STREAM_END)
+    
+    async def generate_stream():
+        queue = asyncio.Queue(maxsize=STREAM_QUEUE_SIZE)
+        reader = asyncio.create_task(read_stream(queue))
+        try:
+            while (item := await queue.get()) is not _STREAM_END:
+                yield item
+            # Surface any unexpected error from the reader
+            await reader
+        finally:
+            # Stop reading if the client disconnected mid-stream
+            reader.cancel()
+    
+    # EventSourceResponse handles keep-alive pings and anti-buffering headers
+    return EventSourceResponse(generate_stream(), ping=15)
 
 # Additional endpoint to get API info
 @app.get("/api/info")
@@ -151,16 +485,27 @@ async def get_api_info():
         "endpoints": {
             "/health": "Health check",
             "/api/summarize": "Summarize text (POST)",
+            "/api/summarize/stream": "Summarize text as a Server-Sent Events stream (POST)",
             "/api/info": "API information"
         },
         "supported_styles": ["concise", "detailed", "bullet_points"]
     }
 
-# Mount static files from UI dist folder (must be last to avoid conflicts with API routes)
-app.mount("/", StaticFiles(directory="ui/dist", html=True), name="static")
+# Static files that serve Vite's content-hashed build assets with long-lived cache headers
+class CachedStaticFiles(StaticFiles):
+    async def get_response(self, path: str, scope):
+        response = await super().get_response(path, scope)
+        if response.status_code == 200 and _HASHED_ASSET_RE.match(path):
+            response.headers["Cache-Control"] = "public, max-age=31536000, immutable"
+        return response
+
+# Mount static files from UI dist folder (must be last to avoid conflicts with API routes).
+# Set SERVE_STATIC=0 when the UI is served by a reverse proxy or CDN instead.
+if os.getenv("SERVE_STATIC", "1") == "1":
+    app.mount("/", CachedStaticFiles(directory="ui/dist", html=True, check_dir=False), name="static")
 
 if __name__ == "__main__":
     import uvicorn
     port = int(os.getenv("PORT", 8000))
     host = os.getenv("HOST", "0.0.0.0")
-    uvicorn.run(app, host=host, port=port)
\ No newline at end of file
+    uvicorn.run(app, host=host, port=port, loop="uvloop", http="httptools")
\ No newline at end of file
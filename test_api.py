@@ -81,6 +81,79 @@ def test_summarization():
         print(f"Error: {e}")
         return False
 
+def test_summarization_stream():
+    """Test the streaming text summarization endpoint"""
+    print("\nTesting streaming text summarization...")
+    
+    # Sample text to summarize
+    sample_text = """
+    The Industrial Revolution began in Britain in the late 18th century and transformed economies that had 
+    been based on agriculture and handicrafts into economies based on large-scale industry, mechanized 
+    manufacturing, and the factory system. New machines, new power sources, and new ways of organizing work 
+    made existing industries more productive and efficient. Steam engines powered factories, mines, and 
+    locomotives, while railways and canals moved goods and people faster than ever before. The revolution 
+    also brought rapid urbanization, changes in social structure, and difficult working conditions that 
+    eventually led to labor reforms and the rise of trade unions.
+    """
+    
+    # Test data
+    test_data = {
+        "text": sample_text.strip(),
+        "style": "bullet_points",
+        "max_length": 200
+    }
+    
+    try:
+        response = requests.post(
+            f"{BASE_URL}/api/summarize/stream",
+            json=test_data,
+            headers={"Content-Type": "application/json"},
+            stream=True
+        )
+        print(f"Status: {response.status_code}")
+        
+        if response.status_code != 200:
+            print(f"Error response: {response.json()}")
+            return False
+        
+        # Read Server-Sent Events until the stream ends
+        chunk_count = 0
+        complete = None
+        event, data_lines = None, []
+        for line in response.iter_lines(decode_unicode=True):
+            if line.startswith("event:"):
+                event = line[len("event:"):].strip()
+            elif line.startswith("data:"):
+                data_lines.append(line[len("data: "):])
+            elif line == "" and event:
+                data = "\n".join(data_lines)
+                if event == "chunk":
+                    chunk_count += 1
+                elif event == "complete":
+                    complete = json.loads(data)
+                elif event == "error":
+                    print(f"Error event: {data}")
+                event, data_lines = None, []
+        
+        print(f"Chunk events: {chunk_count}")
+        if complete is None:
+            print("No complete event received")
+            return False
+        
+        expected_keys = {"summary", "original_word_count", "summary_word_count", "compression_ratio"}
+        if set(complete) != expected_keys:
+            print(f"Unexpected complete event keys: {sorted(complete)}")
+            return False
+        
+        print(f"Original word count: {complete['original_word_count']}")
+        print(f"Summary word count: {complete['summary_word_count']}")
+        print(f"Compression ratio: {complete['compression_ratio']}%")
+        print(f"Summary: {complete['summary']}")
+        return chunk_count > 0
+    except Exception as e:
+        print(f"Error: {e}")
+        return False
+
 def main():
     """Run all tests"""
     print("=== Text Summarizer API Tests ===\n")
@@ -88,7 +161,8 @@ def main():
     tests = [
         ("Health Check", test_health_check),
         ("API Info", test_api_info),
-        ("Text Summarization", test_summarization)
+        ("Text Summarization", test_summarization),
+        ("Streaming Text Summarization", test_summarization_stream)
     ]
     
     results = []
@@ -25,7 +25,8 @@ interface ApiResponse {
 }
 
 interface ApiError {
-  detail: string
+  // Validation errors (422) return a list of error objects instead of a string
+  detail: string | { msg: string }[]
 }
 
 export function TextSummarizer() {
@@ -61,7 +62,8 @@ export function TextSummarizer() {
 
       if (!response.ok) {
         const errorData: ApiError = await response.json()
-        throw new Error(errorData.detail || `HTTP error! status: ${response.status}`)
+        const detail = Array.isArray(errorData.detail) ? errorData.detail[0]?.msg : errorData.detail
+        throw new Error(detail || `HTTP error! status: ${response.status}`)
       }
 
       const data: ApiResponse = await response.json()